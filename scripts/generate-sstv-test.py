@@ -9,55 +9,202 @@ Usage: ./generate-sstv-test.py [output.wav]
 
 import sys
 import os
+import functools
+import hashlib
+import shutil
+import tempfile
 from pathlib import Path
 
+# Color bars (classic SMPTE pattern)
+COLORS = (
+    ('white', (255, 255, 255)),
+    ('yellow', (255, 255, 0)),
+    ('cyan', (0, 255, 255)),
+    ('green', (0, 255, 0)),
+    ('magenta', (255, 0, 255)),
+    ('red', (255, 0, 0)),
+    ('blue', (0, 0, 255)),
+)
+
+# Result summary and transmission procedure, written in one go so it can't
+# interleave with other output
+REPORT = """
+✓ SSTV signal generated successfully!
+  File: {output_file}
+  Size: {file_size:,} bytes ({file_size_mb:.1f} MB)
+  Duration: ~36 seconds
+  Mode: Robot36
+  Sample rate: 48kHz
+
+============================================================
+TRANSMISSION TEST PROCEDURE
+============================================================
+
+1. Transfer the file to your phone/computer:
+   scp {output_file} your-device:/path/
+
+2. Enable 2M SSTV scanning in Night Watch dashboard
+   (Toggle '2M' chip in the top status bar)
+
+3. Set your handheld radio:
+   - Frequency: 144.500 MHz or 145.500 MHz
+   - Mode: FM
+   - Power: Low (1-5W)
+
+4. Play the audio file through the radio:
+   - Connect phone/computer audio to radio mic input
+   - OR play near radio speaker at moderate volume
+   - Press PTT and start playback
+
+5. Watch Night Watch dashboard:
+   - Waterfall should show SSTV signal
+   - System status should change to 'SCAN' → 'REC'
+   - After recording, status → 'DEC' (decoding)
+   - Decoded image appears in gallery
+
+Expected result: Color bar test pattern in the gallery!
+
+"""
+
+CACHE_DIR = Path.home() / ".cache" / "noaa-sstv"
+
+# Modules beside this script whose contents shape the encoded WAV
+CACHE_KEY_MODULES = ("fast_robot36.py", "sstv_pattern.py")
+
+
+def cache_path():
+    """Cache location for the encoded WAV.
+
+    The output is fully determined by this script, the encoder module,
+    the test pattern helpers (which also hold the font path) and their
+    fixed inputs, so hashing those gives a stable key that changes whenever
+    any of them does. Returns None if a helper module is missing; the
+    import check in main() reports that.
+    """
+    key = hashlib.sha256()
+    key.update(Path(__file__).read_bytes())
+    try:
+        for module in CACHE_KEY_MODULES:
+            key.update(Path(__file__).with_name(module).read_bytes())
+    except OSError:
+        return None
+    key.update(repr(COLORS).encode())
+    key.update(b"Robot36/48000/16")
+    return CACHE_DIR / f"{key.hexdigest()}.wav"
+
+
+def link_or_copy(src, dst):
+    """Hardlink src to dst, falling back to a copy across filesystems"""
+    try:
+        os.unlink(dst)
+    except FileNotFoundError:
+        pass
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+def file_size(path):
+    """Size of path from a single stat, or None if it can't be read"""
+    try:
+        return os.stat(path).st_size
+    except OSError:
+        return None
+
+
+def checksum_path(output_file):
+    """Sidecar holding the output's SHA-256, in sha256sum format.
+
+    A trailing comment line (which sha256sum -c ignores) records the cache
+    key the output was built under.
+    """
+    return Path(f"{output_file}.sha256")
+
+
+def file_sha256(path):
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def checksum_matches(output_file, cached_wav):
+    """True if output_file matches its saved checksum and was built under
+    the current cache key, so edits to the scripts force a re-encode"""
+    if cached_wav is None:
+        return False
+    try:
+        lines = checksum_path(output_file).read_text().splitlines()
+        expected = lines[0].split()[0]
+        if lines[1] != f"# cache-key {cached_wav.stem}":
+            return False
+        return file_sha256(output_file) == expected
+    except (OSError, IndexError):
+        return False
+
+
+def write_checksum(output_file, cached_wav):
+    lines = [f"{file_sha256(output_file)}  {Path(output_file).name}"]
+    if cached_wav is not None:
+        lines.append(f"# cache-key {cached_wav.stem}")
+    checksum_path(output_file).write_text("\n".join(lines) + "\n")
+
+
+@functools.lru_cache(maxsize=1)
+def banner_tile():
+    """Identifying text on a black box, rasterized once and pasted as a block"""
+    from PIL import Image, ImageDraw
+    from sstv_pattern import FONT_PATH, load_font
+
+    tile = Image.new('RGB', (221, 61), color='black')
+    draw = ImageDraw.Draw(tile)
+    font = load_font(FONT_PATH, 20)
+    draw.text((10, 10), "NIGHT WATCH", fill='white', font=font)
+    draw.text((10, 35), "TEST SIGNAL", fill='yellow', font=font)
+    return tile
+
+
 def main():
     # Parse arguments
     output_file = sys.argv[1] if len(sys.argv) > 1 else "sstv-test-transmission.wav"
 
     print("=== SSTV Test Signal Generator ===\n")
 
+    # One stat each for the output and the cache entry; the sizes feed
+    # the report, and a hardlink or copy has the cache entry's size
+    cached_wav = cache_path()
+    output_size = file_size(output_file)
+    if output_size is not None and checksum_matches(output_file, cached_wav):
+        print(f"✓ {output_file} matches its checksum, skipping encode")
+        return report(output_file, output_size)
+
+    # Cache entries carry their own sidecar: the output is a hardlink to
+    # its entry, so anything that rewrote the output in place rewrote the
+    # entry too and must not be handed out again
+    cached_size = file_size(cached_wav) if cached_wav else None
+    if cached_size is not None and not checksum_matches(cached_wav, cached_wav):
+        print(f"  Cached SSTV signal failed its checksum, re-encoding: {cached_wav}")
+        cached_size = None
+    if output_size is None and cached_size is not None:
+        link_or_copy(cached_wav, output_file)
+        write_checksum(output_file, cached_wav)
+        print(f"✓ Reused cached SSTV signal: {cached_wav}")
+        return report(output_file, cached_size)
+
     # Check if SSTV module is available
     try:
-        from pysstv.color import Robot36
-        from PIL import Image, ImageDraw, ImageFont
+        from fast_robot36 import FastRobot36
+        from sstv_pattern import color_bars
         print("✓ SSTV encoder module loaded")
     except ImportError as e:
         print(f"ERROR: SSTV module not installed: {e}")
-        print("\nInstall with: pip3 install pysstv")
+        print("\nInstall with: pip3 install pysstv numpy")
         return 1
 
     # Create test pattern image (320x256 for Robot36)
     print("Creating test pattern image...")
-    img = Image.new('RGB', (320, 256), color='black')
-    draw = ImageDraw.Draw(img)
-
-    # Draw color bars (classic SMPTE pattern)
-    colors = [
-        ('white', (255, 255, 255)),
-        ('yellow', (255, 255, 0)),
-        ('cyan', (0, 255, 255)),
-        ('green', (0, 255, 0)),
-        ('magenta', (255, 0, 255)),
-        ('red', (255, 0, 0)),
-        ('blue', (0, 0, 255)),
-    ]
-
-    bar_width = 320 // len(colors)
-    for i, (name, color) in enumerate(colors):
-        x = i * bar_width
-        draw.rectangle([x, 0, x + bar_width, 256], fill=color)
+    img = color_bars([color for _, color in COLORS])
 
     # Add identifying text
-    draw.rectangle([50, 100, 270, 160], fill='black')
-    try:
-        # Try to use a larger font if available
-        font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 20)
-    except:
-        font = ImageFont.load_default()
-
-    draw.text((60, 110), "NIGHT WATCH", fill='white', font=font)
-    draw.text((60, 135), "TEST SIGNAL", fill='yellow', font=font)
+    img.paste(banner_tile(), (50, 100))
 
     print("✓ Test pattern created (320x256, color bars)")
 
@@ -67,49 +214,39 @@ def main():
 
     try:
         # Create Robot36 SSTV mode with the image
-        sstv = Robot36(img, 48000, 16)  # 48kHz sample rate, 16-bit
-
-        # Generate the WAV file
-        sstv.write_wav(output_file)
-
-        file_size = Path(output_file).stat().st_size
-        print(f"\n✓ SSTV signal generated successfully!")
-        print(f"  File: {output_file}")
-        print(f"  Size: {file_size:,} bytes ({file_size / 1024 / 1024:.1f} MB)")
-        print(f"  Duration: ~36 seconds")
-        print(f"  Mode: Robot36")
-        print(f"  Sample rate: 48kHz")
-
-        print("\n" + "=" * 60)
-        print("TRANSMISSION TEST PROCEDURE")
-        print("=" * 60)
-        print()
-        print("1. Transfer the file to your phone/computer:")
-        print(f"   scp {output_file} your-device:/path/")
-        print()
-        print("2. Enable 2M SSTV scanning in Night Watch dashboard")
-        print("   (Toggle '2M' chip in the top status bar)")
-        print()
-        print("3. Set your handheld radio:")
-        print("   - Frequency: 144.500 MHz or 145.500 MHz")
-        print("   - Mode: FM")
-        print("   - Power: Low (1-5W)")
-        print()
-        print("4. Play the audio file through the radio:")
-        print("   - Connect phone/computer audio to radio mic input")
-        print("   - OR play near radio speaker at moderate volume")
-        print("   - Press PTT and start playback")
-        print()
-        print("5. Watch Night Watch dashboard:")
-        print("   - Waterfall should show SSTV signal")
-        print("   - System status should change to 'SCAN' → 'REC'")
-        print("   - After recording, status → 'DEC' (decoding)")
-        print("   - Decoded image appears in gallery")
-        print()
-        print("Expected result: Color bar test pattern in the gallery!")
-        print()
-
-        return 0
+        sstv = FastRobot36(img, 48000, 16)  # 48kHz sample rate, 16-bit
+
+        # Generate the WAV file into the cache, then link it into place.
+        # Each run writes its own temp file so concurrent runs can't publish
+        # a half-written cache entry.
+        try:
+            if cached_wav is None:
+                raise FileNotFoundError("no cache key without the helper modules")
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            fd, tmp_wav = tempfile.mkstemp(dir=CACHE_DIR, suffix=".wav.tmp")
+            os.close(fd)
+            try:
+                sstv.write_wav(tmp_wav)
+                os.chmod(tmp_wav, 0o644)  # mkstemp creates it 0600
+                os.replace(tmp_wav, cached_wav)
+            except BaseException:
+                os.unlink(tmp_wav)
+                raise
+            write_checksum(cached_wav, cached_wav)
+            link_or_copy(cached_wav, output_file)
+        except OSError as e:
+            # Cache unavailable (read-only home, etc.) - write directly.
+            # Unlink first: the output may still be a hardlink to an older
+            # cache entry, which writing through it would overwrite.
+            print(f"  Cache unavailable ({e}), writing output directly")
+            try:
+                os.unlink(output_file)
+            except FileNotFoundError:
+                pass
+            sstv.write_wav(output_file)
+
+        write_checksum(output_file, cached_wav)
+        return report(output_file)
 
     except Exception as e:
         print(f"\n✗ ERROR: Failed to encode SSTV: {e}")
@@ -117,5 +254,18 @@ def main():
         traceback.print_exc()
         return 1
 
+
+def report(output_file, size=None):
+    """Print the result summary and transmission procedure"""
+    if size is None:
+        size = os.stat(output_file).st_size
+    sys.stdout.write(REPORT.format(
+        output_file=output_file,
+        file_size=size,
+        file_size_mb=size / 1024 / 1024,
+    ))
+    sys.stdout.flush()
+    return 0
+
 if __name__ == "__main__":
     sys.exit(main())
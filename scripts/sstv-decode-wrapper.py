@@ -2,32 +2,60 @@
 """
 SSTV Decoder Wrapper
 Fixes TTY issues when running SSTV decoder in non-interactive environments
+
+Usage: sstv-decode-wrapper.py <input.wav> <output> [--format png|bmp|npy]
 """
 import sys
 import os
+import argparse
 
 # Monkey patch get_terminal_size to avoid "Inappropriate ioctl for device" error
 # This happens when running in Docker, CI, or non-interactive shells
-from collections import namedtuple
-TermSize = namedtuple("TermSize", ["columns", "lines"])
-os.get_terminal_size = lambda: TermSize(80, 24)
+os.get_terminal_size = lambda *args, **kwargs: os.terminal_size((80, 24))
+
+
+def save_image(image, output_path, image_format):
+    """Save the decoded image; bmp and npy skip compression for scratch output"""
+    if image_format == "npy":
+        import numpy as np
+
+        # Write through a file object so np.save keeps the path as given
+        with open(output_path, "wb") as f:
+            np.save(f, np.asarray(image))
+    elif image_format == "bmp":
+        image.save(output_path, format="BMP")
+    else:
+        # Fast zlib level: SSTV images are small and barely compress further
+        image.save(output_path, format="PNG", compress_level=1, optimize=False)
 
-# Now safely import SSTV decoder
-from sstv.decode import SSTVDecoder
 
 def main():
-    if len(sys.argv) != 3:
-        print("Usage: sstv-decode-wrapper.py <input.wav> <output.png>", file=sys.stderr)
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="Decode an SSTV recording to an image")
+    parser.add_argument("input_wav")
+    parser.add_argument("output_image")
+    parser.add_argument(
+        "--format",
+        choices=("png", "bmp", "npy"),
+        default="png",
+        help="output format (default: png)",
+    )
+    args = parser.parse_args()
 
-    input_wav = sys.argv[1]
-    output_png = sys.argv[2]
+    input_wav = args.input_wav
+    output_image = args.output_image
 
-    # Check input file exists
-    if not os.path.exists(input_wav):
+    # Check input file exists (OSError also covers e.g. a path through a
+    # regular file, which raises NotADirectoryError)
+    try:
+        os.stat(input_wav)
+    except OSError:
         print(f"ERROR: Input file not found: {input_wav}", file=sys.stderr)
         sys.exit(1)
 
+    # Import the decoder only once the arguments check out; it pulls in
+    # NumPy and friends. The terminal size patch above makes this safe.
+    from sstv.decode import SSTVDecoder
+
     try:
         # Decode SSTV signal
         decoder = SSTVDecoder(input_wav)
@@ -35,8 +63,8 @@ def main():
 
         # Check if we got an image
         if hasattr(decoder, 'image') and decoder.image:
-            decoder.image.save(output_png)
-            print(f"SUCCESS: Saved SSTV image to {output_png}")
+            save_image(decoder.image, output_image, args.format)
+            print(f"SUCCESS: Saved SSTV image to {output_image}")
             sys.exit(0)
         else:
             print("FAILED: No SSTV signal detected in audio file", file=sys.stderr)
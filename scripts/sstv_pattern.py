@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+SSTV test pattern helpers
+Image building blocks shared by generate-sstv-test.py and
+test-sstv-roundtrip.py, kept apart from the encoder in fast_robot36.py.
+"""
+
+import functools
+
+import numpy as np
+from PIL import Image, ImageFont
+
+# Font for the text on the test patterns
+FONT_PATH = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
+
+
+def color_bars(colors, width=320, height=256):
+    """Vertical color bar test pattern as an RGB image.
+
+    Built as one row broadcast down the image. Matches the inclusive
+    ImageDraw.rectangle bars it replaces: the last bar also covers the
+    column after it, and any columns beyond that stay black.
+    """
+    palette = np.array(colors, dtype=np.uint8)
+    bar_width = width // len(palette)
+    end = bar_width * len(palette)
+    row = np.zeros((width, 3), dtype=np.uint8)
+    row[:end] = np.repeat(palette, bar_width, axis=0)
+    row[end:end + 1] = palette[-1]
+    return Image.fromarray(np.ascontiguousarray(np.broadcast_to(row, (height, width, 3))))
+
+
+@functools.lru_cache(maxsize=4)
+def load_font(path, size):
+    """Load a TrueType font once, falling back to PIL's built-in font"""
+    try:
+        return ImageFont.truetype(path, size)
+    except OSError:
+        return ImageFont.load_default()
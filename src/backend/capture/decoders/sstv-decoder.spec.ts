@@ -79,6 +79,16 @@ describe('sstvDecoder', () => {
       )
     })
 
+    it('should request PNG output from the wrapper', async () => {
+      mockFileExists.mockResolvedValue(true)
+      mockRunCommand.mockResolvedValue({ exitCode: 0, stdout: '', stderr: '' })
+
+      await sstvDecoder.decode('/path/to/recording.wav', '/output')
+
+      const [, args] = mockRunCommand.mock.calls[0] as [string, string[]]
+      expect(args.slice(-2)).toEqual(['--format', 'png'])
+    })
+
     it('should return output path for successful decode', async () => {
       mockFileExists.mockResolvedValue(true)
       mockRunCommand.mockResolvedValue({ exitCode: 0, stdout: '', stderr: '' })
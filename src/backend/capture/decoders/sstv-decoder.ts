@@ -4,20 +4,26 @@ import { logger } from '../../utils/logger'
 import { runCommand } from '../../utils/shell'
 import type { Decoder, DecoderResult } from './types'
 
+// Decoded images go straight to the gallery, so ask the wrapper for PNG
+// rather than its uncompressed scratch formats (bmp, npy)
+const SSTV_IMAGE_FORMAT = 'png'
+
 const decodeWithSstv = async (
   wavPath: string,
   outputDir: string
 ): Promise<DecoderResult | null> => {
   const baseName = basename(wavPath, '.wav')
-  const outputPath = join(outputDir, `${baseName}-sstv.png`)
+  const outputPath = join(outputDir, `${baseName}-sstv.${SSTV_IMAGE_FORMAT}`)
 
   logger.image('Decoding SSTV image...')
 
   // Use Python wrapper to avoid TTY issues in non-interactive environments
   const wrapperPath = join(process.cwd(), 'scripts', 'sstv-decode-wrapper.py')
-  const result = await runCommand('python3', [wrapperPath, wavPath, outputPath], {
-    timeout: 300000,
-  })
+  const result = await runCommand(
+    'python3',
+    [wrapperPath, wavPath, outputPath, '--format', SSTV_IMAGE_FORMAT],
+    { timeout: 300000 }
+  )
 
   const success = result.exitCode === 0 && (await fileExists(outputPath))
 